@@ -5,8 +5,6 @@
 
 """Charm for WordPress on kubernetes."""
 
-import collections
-import itertools
 import json
 import logging
 import os
@@ -16,9 +14,8 @@ import string
 import textwrap
 import time
 import traceback
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-import mysql.connector
 import ops.charm
 import ops.pebble
 import yaml
@@ -39,16 +36,25 @@ from ops.model import (
 )
 from ops.pebble import ExecProcess
 from opslib.mysql import MySQLClient, MySQLDatabaseChangedEvent
-from yaml import safe_load
 
 import exceptions
 import types_
 from cos import APACHE_LOG_PATHS, PROM_EXPORTER_PEBBLE_CONFIG, WORDPRESS_SCRAPE_JOBS
 
+# Prefer the LibYAML backed loader when available, it is much faster than the pure Python one
+# while keeping the same safe loading semantics.
+try:
+    from yaml import CSafeLoader as _YamlSafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _YamlSafeLoader  # type: ignore[assignment]
+
 # MySQL logger prints database credentials on debug level, silence it
-logging.getLogger(mysql.connector.__name__).setLevel(logging.WARNING)
+logging.getLogger("mysql.connector").setLevel(logging.WARNING)
 logger = logging.getLogger()
 
+# Trailing uploads path in the legacy swift ``url`` option, see WordpressCharm._swift_config.
+_LEGACY_SWIFT_UPLOADS_SUFFIX_RE = re.compile("/wp-content/uploads/?$")
+
 
 class WordpressCharm(CharmBase):
     """Charm for WordPress on kubernetes.
@@ -68,71 +74,111 @@ class WordpressCharm(CharmBase):
     _WORDPRESS_DB_CHARSET = "utf8mb4"
     _DATABASE_RELATION_NAME = "database"
     _LEGACY_DB_RELATION_NAME = "db"
+    # Charm config keys providing the database connection, mapped to DatabaseConfig fields.
+    _DB_CONFIG_FIELDS = {
+        "db_host": "hostname",
+        "db_name": "database",
+        "db_user": "username",
+        "db_password": "password",
+    }
 
     # Default themes and plugins are installed in oci image build time and defined in Dockerfile
-    _WORDPRESS_DEFAULT_THEMES = [
-        "fruitful",
-        "launchpad",
-        "light-wordpress-theme",
-        "mscom",
-        "thematic",
-        "twentyeleven",
-        "twentytwenty",
-        "twentytwentyone",
-        "twentytwentytwo",
-        "ubuntu-cloud-website",
-        "ubuntu-community-wordpress-theme/ubuntu-community",
-        "ubuntu-community/ubuntu-community",
-        "ubuntu-fi",
-        "ubuntu-light",
-        "ubuntustudio-wp/ubuntustudio-wp",
-        "xubuntu-website/xubuntu-eighteen",
-        "xubuntu-website/xubuntu-fifteen",
-        "xubuntu-website/xubuntu-fourteen",
-        "xubuntu-website/xubuntu-thirteen",
-    ]
-
-    _WORDPRESS_DEFAULT_PLUGINS = [
-        "404page",
-        "akismet",
-        "all-in-one-event-calendar",
-        "powerpress",
-        "coschedule-by-todaymade",
-        "elementor",
-        "essential-addons-for-elementor-lite",
-        "favicon-by-realfavicongenerator",
-        "feedwordpress",
-        "fruitful-shortcodes",
-        "genesis-columns-advanced",
-        "hello",
-        "line-break-shortcode",
-        "wp-mastodon-share",
-        "no-category-base-wpml",
-        "openid",
-        "wordpress-launchpad-integration",
-        "wordpress-teams-integration",
-        "openstack-objectstorage-k8s",
-        "post-grid",
-        "redirection",
-        "relative-image-urls",
-        "rel-publisher",
-        "safe-svg",
-        "show-current-template",
-        "simple-301-redirects",
-        "simple-custom-css",
-        "so-widgets-bundle",
-        "social-media-buttons-toolbar",
-        "svg-support",
-        "syntaxhighlighter",
-        "wordpress-importer",
-        "wp-markdown",
-        "wp-polls",
-        "wp-font-awesome",
-        "wp-lightbox-2",
-        "wp-statistics",
-        "xubuntu-team-members",
-        "wordpress-seo",
-    ]
+    _WORDPRESS_DEFAULT_THEMES = frozenset(
+        (
+            "fruitful",
+            "launchpad",
+            "light-wordpress-theme",
+            "mscom",
+            "thematic",
+            "twentyeleven",
+            "twentytwenty",
+            "twentytwentyone",
+            "twentytwentytwo",
+            "ubuntu-cloud-website",
+            "ubuntu-community-wordpress-theme/ubuntu-community",
+            "ubuntu-community/ubuntu-community",
+            "ubuntu-fi",
+            "ubuntu-light",
+            "ubuntustudio-wp/ubuntustudio-wp",
+            "xubuntu-website/xubuntu-eighteen",
+            "xubuntu-website/xubuntu-fifteen",
+            "xubuntu-website/xubuntu-fourteen",
+            "xubuntu-website/xubuntu-thirteen",
+        )
+    )
+
+    _WORDPRESS_DEFAULT_PLUGINS = frozenset(
+        (
+            "404page",
+            "akismet",
+            "all-in-one-event-calendar",
+            "powerpress",
+            "coschedule-by-todaymade",
+            "elementor",
+            "essential-addons-for-elementor-lite",
+            "favicon-by-realfavicongenerator",
+            "feedwordpress",
+            "fruitful-shortcodes",
+            "genesis-columns-advanced",
+            "hello",
+            "line-break-shortcode",
+            "wp-mastodon-share",
+            "no-category-base-wpml",
+            "openid",
+            "wordpress-launchpad-integration",
+            "wordpress-teams-integration",
+            "openstack-objectstorage-k8s",
+            "post-grid",
+            "redirection",
+            "relative-image-urls",
+            "rel-publisher",
+            "safe-svg",
+            "show-current-template",
+            "simple-301-redirects",
+            "simple-custom-css",
+            "so-widgets-bundle",
+            "social-media-buttons-toolbar",
+            "svg-support",
+            "syntaxhighlighter",
+            "wordpress-importer",
+            "wp-markdown",
+            "wp-polls",
+            "wp-font-awesome",
+            "wp-lightbox-2",
+            "wp-statistics",
+            "xubuntu-team-members",
+            "wordpress-seo",
+        )
+    )
+
+    _SWIFT_REQUIRED_CONFIG_KEYS = (
+        "auth-url",
+        "bucket",
+        "password",
+        "object-prefix",
+        "region",
+        "tenant",
+        "domain",
+        "swift-url",
+        "username",
+        "copy-to-swift",
+        "serve-from-swift",
+        "remove-local-file",
+    )
+
+    # Field names of secrets required for instantiation of WordPress. These secrets are used by
+    # WordPress to enhance the security by encrypting information.
+    _WORDPRESS_SECRET_KEY_FIELDS = (
+        "auth_key",
+        "secure_auth_key",
+        "logged_in_key",
+        "nonce_key",
+        # These salts are for cookies. They should not affect user passwords.
+        "auth_salt",
+        "secure_auth_salt",
+        "logged_in_salt",
+        "nonce_salt",
+    )
 
     _DB_CHECK_INTERVAL = 1
     _DB_CHECK_TIMEOUT = 300
@@ -162,6 +208,11 @@ class WordpressCharm(CharmBase):
             started=False,
         )
 
+        # Inputs of the last successful reconciliation, a charm instance only lives for one hook.
+        self._reconciled_inputs: Optional[
+            Tuple[bool, Dict[str, Any], Optional[types_.DatabaseConfig], Dict[str, str]]
+        ] = None
+
         self._require_nginx_route()
         self.metrics_endpoint = MetricsEndpointProvider(
             self,
@@ -262,38 +313,14 @@ class WordpressCharm(CharmBase):
             )
             return
 
-        # Update the secrets in peer relation.
-        replica_relation_data = self._replica_relation_data()
-        wordpress_secrets = self._generate_wp_secret_keys()
-        for secret_key, secret_value in wordpress_secrets.items():
-            replica_relation_data[secret_key] = secret_value
+        # Update the secrets in peer relation with a single update call.
+        self._replica_relation_data().update(self._generate_wp_secret_keys())
 
         # Leader need to call `_reconciliation` manually.
         # Followers call it automatically due to relation_changed event.
         self._reconciliation(event)
         event.set_results({"result": "ok"})
 
-    @staticmethod
-    def _wordpress_secret_key_fields():
-        """Field names of secrets required for instantiation of WordPress.
-
-        These secrets are used by WordPress to enhance the security by encrypting information.
-
-        Returns:
-            Secret key fields required for WordPress to encrypt information.
-        """
-        return [
-            "auth_key",
-            "secure_auth_key",
-            "logged_in_key",
-            "nonce_key",
-            # These salts are for cookies. They should not affect user passwords.
-            "auth_salt",
-            "secure_auth_salt",
-            "logged_in_salt",
-            "nonce_salt",
-        ]
-
     def _generate_wp_secret_keys(self) -> Dict[str, str]:
         """Generate random secure secrets for each secret required by WordPress.
 
@@ -314,7 +341,7 @@ class WordpressCharm(CharmBase):
             return "".join(secrets.choice(characters) for _ in range(length))
 
         wp_secrets = {
-            field: _wp_generate_password() for field in self._wordpress_secret_key_fields()
+            field: _wp_generate_password() for field in self._WORDPRESS_SECRET_KEY_FIELDS
         }
         wp_secrets["default_admin_password"] = secrets.token_urlsafe(32)
         return wp_secrets
@@ -344,12 +371,11 @@ class WordpressCharm(CharmBase):
         Returns:
             True if the initialization of synchronized data has finished, else False.
         """
-        fields = self._wordpress_secret_key_fields()
         try:
             replica_data = self._replica_relation_data()
         except self._ReplicaRelationNotReady:
             return False
-        return all(replica_data.get(f) for f in fields)
+        return all(replica_data.get(f) for f in self._WORDPRESS_SECRET_KEY_FIELDS)
 
     def _setup_replica_data(self, _event: LeaderElectedEvent) -> None:
         """Initialize the synchronized data required for WordPress replication.
@@ -362,10 +388,7 @@ class WordpressCharm(CharmBase):
             _event: required by ops framework, not used.
         """
         if not self._replica_consensus_reached() and self.unit.is_leader():
-            replica_relation_data = self._replica_relation_data()
-            new_replica_data = self._generate_wp_secret_keys()
-            for secret_key, secret_value in new_replica_data.items():
-                replica_relation_data[secret_key] = secret_value
+            self._replica_relation_data().update(self._generate_wp_secret_keys())
 
     def _on_relation_db_changed(self, event: MySQLDatabaseChangedEvent) -> None:
         """Handle db relation changes (data changes/relation breaks).
@@ -419,17 +442,16 @@ class WordpressCharm(CharmBase):
             )
         ]
 
-        if self._current_effective_db_info:
-            wp_config.append(f"define( 'DB_HOST', '{self._current_effective_db_info.hostname}' );")
-            wp_config.append(f"define( 'DB_NAME', '{self._current_effective_db_info.database}' );")
-            wp_config.append(f"define( 'DB_USER', '{self._current_effective_db_info.username}' );")
-            wp_config.append(
-                f"define( 'DB_PASSWORD', '{self._current_effective_db_info.password}' );"
-            )
+        db_info = self._current_effective_db_info
+        if db_info:
+            wp_config.append(f"define( 'DB_HOST', '{db_info.hostname}' );")
+            wp_config.append(f"define( 'DB_NAME', '{db_info.database}' );")
+            wp_config.append(f"define( 'DB_USER', '{db_info.username}' );")
+            wp_config.append(f"define( 'DB_PASSWORD', '{db_info.password}' );")
             wp_config.append(f"define( 'DB_CHARSET',  '{self._WORDPRESS_DB_CHARSET}' );")
 
         replica_relation_data = self._replica_relation_data()
-        for secret_key in self._wordpress_secret_key_fields():
+        for secret_key in self._WORDPRESS_SECRET_KEY_FIELDS:
             secret_value = replica_relation_data[secret_key]
             wp_config.append(f"define( '{secret_key.upper()}', '{secret_value}' );")
 
@@ -461,22 +483,15 @@ class WordpressCharm(CharmBase):
         """
         return self.unit.get_container(self._CONTAINER_NAME)
 
-    def _wordpress_service_exists(self) -> bool:
-        """Check if the WordPress pebble layer exists.
-
-        Returns:
-            True if WordPress layer already exists, else False.
-        """
-        return self._SERVICE_NAME in self._container().get_plan().services
-
     def _stop_server(self) -> None:
         """Stop WordPress (apache) server, this operation is idempotent."""
         logger.info("Ensure WordPress (apache) server is down")
-        if (
-            self._wordpress_service_exists()
-            and self._container().get_service(self._SERVICE_NAME).is_running()
-        ):
-            self._container().stop(self._SERVICE_NAME)
+        container = self._container()
+        # get_services only returns services defined in the plan, so a single query covers both
+        # the existence and the running state check.
+        service = container.get_services(self._SERVICE_NAME).get(self._SERVICE_NAME)
+        if service is not None and service.is_running():
+            container.stop(self._SERVICE_NAME)
 
     def _run_cli(
         self,
@@ -500,10 +515,9 @@ class WordpressCharm(CharmBase):
                 ``TimeoutError`` will be raised if timeout exceeded.
 
         Returns:
-            A named tuple with three fields: return code, stdout and stderr. Stdout and stderr are
+            A result with three fields: return code, stdout and stderr. Stdout and stderr are
             both string.
         """
-        Result = collections.namedtuple("CommandExecResult", "return_code stdout stderr")
         process: ExecProcess = self._container().exec(
             cmd,
             user=user,
@@ -516,7 +530,9 @@ class WordpressCharm(CharmBase):
             stdout, stderr = process.wait_output()
             result = types_.CommandExecResult(return_code=0, stdout=stdout, stderr=stderr)
         except ops.pebble.ExecError as error:
-            result = Result(error.exit_code, error.stdout, error.stderr)
+            result = types_.CommandExecResult(
+                return_code=error.exit_code, stdout=error.stdout, stderr=error.stderr
+            )
         return_code = result.return_code
         if combine_stderr:
             logger.debug(
@@ -576,7 +592,7 @@ class WordpressCharm(CharmBase):
                 a default error message will be provided in the result.
 
         Returns:
-            A named tuple with three fields: success, result and message. ``success`` will be True
+            A result with three fields: success, result and message. ``success`` will be True
             if the command succeed. ``result`` will always be None and ``message`` represents the
             error message, in case of success, it will be empty.
         """
@@ -585,7 +601,7 @@ class WordpressCharm(CharmBase):
             return types_.ExecResult(
                 success=False,
                 result=None,
-                message=f"command {cmd} failed" if not error_message else error_message,
+                message=error_message or f"command {cmd} failed",
             )
         return types_.ExecResult(success=True, result=None, message="")
 
@@ -606,14 +622,10 @@ class WordpressCharm(CharmBase):
             Database configuration required to establish database connection.
             None if not exists.
         """
-        if any(
-            self.model.config.get(key) for key in ("db_host", "db_name", "db_user", "db_password")
-        ):
+        config = self.model.config
+        if any(config.get(key) for key in self._DB_CONFIG_FIELDS):
             return types_.DatabaseConfig(
-                hostname=self.model.config.get("db_host"),
-                database=self.model.config.get("db_name"),
-                username=self.model.config.get("db_user"),
-                password=self.model.config.get("db_password"),
+                **{field: config.get(key) for key, field in self._DB_CONFIG_FIELDS.items()}
             )
         return None
 
@@ -672,11 +684,12 @@ class WordpressCharm(CharmBase):
         relation = self.model.get_relation(self._DATABASE_RELATION_NAME)
         if not relation:
             return None
+        relation_data = relation.data[relation.app]
         return types_.DatabaseConfig(
-            hostname=self._parse_database_endpoints(relation.data[relation.app].get("endpoints")),
-            database=relation.data[relation.app].get("database"),
-            username=relation.data[relation.app].get("username"),
-            password=relation.data[relation.app].get("password"),
+            hostname=self._parse_database_endpoints(relation_data.get("endpoints")),
+            database=relation_data.get("database"),
+            username=relation_data.get("username"),
+            password=relation_data.get("password"),
         )
 
     @property
@@ -705,13 +718,17 @@ class WordpressCharm(CharmBase):
             A tuple of connectivity as bool and error message as str, error message will be
             an empty string if charm can connect to the database.
         """
+        # mysql.connector is slow to import and only needed here, avoid paying for it on every hook.
+        import mysql.connector  # pylint: disable=import-outside-toplevel
+
+        db_info = self._current_effective_db_info
         try:
             # TODO: add database charset check later
             cnx = mysql.connector.connect(
-                host=self._current_effective_db_info.hostname,
-                database=self._current_effective_db_info.database,
-                user=self._current_effective_db_info.username,
-                password=self._current_effective_db_info.password,
+                host=db_info.hostname,
+                database=db_info.database,
+                user=db_info.username,
+                password=db_info.password,
                 charset="latin1",
             )
             cnx.close()
@@ -727,7 +744,9 @@ class WordpressCharm(CharmBase):
         Returns:
             Wp-cli WordPress install command, a list of strings.
         """
-        initial_settings = yaml.safe_load(self.model.config["initial_settings"])
+        initial_settings = yaml.load(  # nosec B506
+            self.model.config["initial_settings"], Loader=_YamlSafeLoader
+        )
         admin_user = initial_settings.get("user_name", "admin_username")
         admin_email = initial_settings.get("admin_email", "name@example.com")
         default_admin_password = self._replica_relation_data()["default_admin_password"]
@@ -819,20 +838,26 @@ class WordpressCharm(CharmBase):
                 "required file (wp-config.php) for starting WordPress server does not exists"
             )
         self._init_pebble_layer()
-        if not self._container().get_service(self._SERVICE_NAME).is_running():
-            self._container().start(self._SERVICE_NAME)
+        container = self._container()
+        if not container.get_service(self._SERVICE_NAME).is_running():
+            container.start(self._SERVICE_NAME)
 
     def _current_wp_config(self):
         """Retrieve the current version of wp-config.php from server, return None if not exists.
 
         Returns:
             The content of the current wp-config.php file, str.
+
+        Raises:
+            PathError: if the wp-config.php file cannot be read for reasons other than not existing.
         """
-        wp_config_path = self._WP_CONFIG_PATH
-        container = self._container()
-        if container.exists(wp_config_path):
-            return self._container().pull(wp_config_path).read()
-        return None
+        # A single pull instead of an exists check followed by a pull saves one pebble round trip.
+        try:
+            return self._container().pull(self._WP_CONFIG_PATH).read()
+        except ops.pebble.PathError as exc:
+            if exc.kind == "not-found":
+                return None
+            raise
 
     def _push_wp_config(self, wp_config: str) -> None:
         """Update the content of wp-config.php on server.
@@ -908,7 +933,7 @@ class WordpressCharm(CharmBase):
             addon_type (str): ``"theme"`` or ``"plugin"``
 
         Returns:
-            A named tuple with three fields: success, result and message. If list command failed,
+            A result with three fields: success, result and message. If list command failed,
             success will be False, result will be None and message will be the error message.
             Other than that, success will be True, message will be empty and result will be a list
             of dicts represents the status of currently installed addons. Each dict contains four
@@ -978,7 +1003,7 @@ class WordpressCharm(CharmBase):
         """
         self._check_addon_type(addon_type)
         logger.info("Start %s reconciliation process", addon_type)
-        current_installed_addons = set(t["name"] for t in self._wp_addon_list(addon_type).result)
+        current_installed_addons = {t["name"] for t in self._wp_addon_list(addon_type).result}
         logger.debug("Currently installed %s %s", addon_type, current_installed_addons)
         addons_in_config = [
             t.strip() for t in self.model.config[f"{addon_type}s"].split(",") if t.strip()
@@ -988,7 +1013,7 @@ class WordpressCharm(CharmBase):
             if addon_type == "theme"
             else self._WORDPRESS_DEFAULT_PLUGINS
         )
-        desired_addons = set(itertools.chain(addons_in_config, default_addons))
+        desired_addons = default_addons.union(addons_in_config)
         install_addons = desired_addons - current_installed_addons
         uninstall_addons = current_installed_addons - desired_addons
         for addon in install_addons:
@@ -1336,21 +1361,7 @@ class WordpressCharm(CharmBase):
             Swift configuration in dict.
         """
         swift_config_str = self.model.config["wp_plugin_openstack-objectstorage_config"]
-        required_swift_config_key = [
-            "auth-url",
-            "bucket",
-            "password",
-            "object-prefix",
-            "region",
-            "tenant",
-            "domain",
-            "swift-url",
-            "username",
-            "copy-to-swift",
-            "serve-from-swift",
-            "remove-local-file",
-        ]
-        swift_config = safe_load(swift_config_str)
+        swift_config = yaml.load(swift_config_str, Loader=_YamlSafeLoader)  # nosec B506
         if not swift_config:
             return {}
         # legacy version of the WordPress charm accepts the ``url`` options
@@ -1361,7 +1372,7 @@ class WordpressCharm(CharmBase):
         # TODO: instead of user input, lookup swift url using swift client automatically
         if "url" in swift_config:
             swift_url = swift_config["url"]
-            swift_url = re.sub("/wp-content/uploads/?$", "", swift_url)
+            swift_url = _LEGACY_SWIFT_UPLOADS_SUFFIX_RE.sub("", swift_url)
             swift_url = swift_url[: -(1 + len(swift_config.get("bucket", "")))]
             logger.warning(
                 "Convert legacy openstack object storage configuration url (%s) to swift-url (%s)",
@@ -1380,7 +1391,7 @@ class WordpressCharm(CharmBase):
             )
             del swift_config["prefix"]
             swift_config["object-prefix"] = object_prefix
-        for key in required_swift_config_key:
+        for key in self._SWIFT_REQUIRED_CONFIG_KEYS:
             if key not in swift_config:
                 raise exceptions.WordPressBlockedStatusException(
                     f"missing {key} in wp_plugin_openstack-objectstorage_config"
@@ -1459,15 +1470,49 @@ class WordpressCharm(CharmBase):
     def _storage_mounted(self) -> bool:
         """Check if the upload storage mounted in the wordpress container.
 
+        The caller is responsible for checking that the wordpress container can be connected.
+
         Returns:
             True if the storage "upload" is attached to the container.
         """
-        container = self._container()
-        if not container.can_connect():
-            return False
-        mount_info: str = container.pull("/proc/mounts").read()
+        mount_info: str = self._container().pull("/proc/mounts").read()
         return "/var/www/html/wp-content/uploads" in mount_info
 
+    def _reconciliation_inputs(
+        self,
+    ) -> Tuple[bool, Dict[str, Any], Optional[types_.DatabaseConfig], Dict[str, str]]:
+        """Snapshot the charm inputs the reconciliation process depends on.
+
+        Returns:
+            A tuple of leadership, charm config, effective database info and replica relation
+            data.
+        """
+        try:
+            replica_data = dict(self._replica_relation_data())
+        except self._ReplicaRelationNotReady:
+            replica_data = {}
+        return (
+            self.unit.is_leader(),
+            dict(self.model.config),
+            self._current_effective_db_info,
+            replica_data,
+        )
+
+    def _reconcile_if_inputs_changed(self) -> None:
+        """Run the core, theme and plugin reconciliation unless already done with the same inputs.
+
+        Several events (including re-emitted deferred ones) can trigger the reconciliation in a
+        single hook, the repeated runs are skipped if nothing has changed in between.
+        """
+        inputs = self._reconciliation_inputs()
+        if inputs == self._reconciled_inputs:
+            logger.info("Reconciliation inputs unchanged in this hook, skip reconciliation")
+            return
+        self._core_reconciliation()
+        self._theme_reconciliation()
+        self._plugin_reconciliation()
+        self._reconciled_inputs = inputs
+
     def _reconciliation(self, _event: EventBase) -> None:
         """Reconcile the WordPress charm on juju event.
 
@@ -1490,9 +1535,7 @@ class WordpressCharm(CharmBase):
             _event.defer()
             return
         try:
-            self._core_reconciliation()
-            self._theme_reconciliation()
-            self._plugin_reconciliation()
+            self._reconcile_if_inputs_changed()
             logger.info("Reconciliation process finished successfully.")
         except exceptions.WordPressStatusException as status_exception:
             logger.info("Reconciliation process terminated early, reason: %s", status_exception)
@@ -1,7 +1,8 @@
 # Copyright 2023 Canonical Ltd.
 # See LICENSE file for licensing details.
 
-from typing import Any, Dict, List, NamedTuple, Optional, Tuple, TypedDict, Union
+import dataclasses
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, TypedDict, Union
 
 import ops
 import ops.framework
@@ -17,19 +18,14 @@ class AddonInfoDict(TypedDict):
     update: str
     version: str
 
-# FIXME: fixme after generic named tuple is fully supported
-class ExecResultListOfAddonInfoDict(NamedTuple):
+@dataclasses.dataclass(frozen=True)
+class ExecResultListOfAddonInfoDict:
     success: bool
     result: Optional[List[AddonInfoDict]]
     message: str
 
 class WordpressCharm(ops.charm.CharmBase):
     class _ReplicaRelationNotReady(Exception): ...
-
-    class _ExecResult(NamedTuple):
-        success: bool
-        result: Any
-        message: str
     state: ops.framework.StoredState
     ingress: IngressRequires
     _WP_CONFIG_PATH: str
@@ -38,19 +34,20 @@ class WordpressCharm(ops.charm.CharmBase):
     _WORDPRESS_USER: str
     _WORDPRESS_GROUP: str
     _WORDPRESS_DB_CHARSET: str
+    _DB_CONFIG_FIELDS: Dict[str, str]
 
     _DB_CHECK_INTERVAL: Union[float, int]
     _DB_CHECK_TIMEOUT: Union[float, int]
 
-    _WORDPRESS_DEFAULT_THEMES: List[str]
-    _WORDPRESS_DEFAULT_PLUGINS: List[str]
+    _WORDPRESS_DEFAULT_THEMES: FrozenSet[str]
+    _WORDPRESS_DEFAULT_PLUGINS: FrozenSet[str]
+    _WORDPRESS_SECRET_KEY_FIELDS: Tuple[str, ...]
+    _SWIFT_REQUIRED_CONFIG_KEYS: Tuple[str, ...]
     def _on_start(self, _event: ops.charm.StartEvent) -> None: ...
     def _require_nginx_route(self) -> None: ...
     def _on_storage_attached(self, _event: ops.charm.StorageAttachedEvent) -> None: ...
     def _on_get_initial_password_action(self, event: ops.charm.ActionEvent) -> None: ...
     def _on_rotate_wordpress_secrets_action(self, event: ops.charm.ActionEvent) -> None: ...
-    @staticmethod
-    def _wordpress_secret_key_fields() -> List[str]: ...
     def _generate_wp_secret_keys(self) -> Dict[str, str]: ...
     def _replica_relation_data(self) -> ops.charm.model.RelationDataContent: ...
     def _replica_consensus_reached(self) -> bool: ...
@@ -60,7 +57,6 @@ class WordpressCharm(ops.charm.CharmBase):
     ) -> None: ...
     def _gen_wp_config(self) -> str: ...
     def _container(self) -> ops.charm.model.Container: ...
-    def _wordpress_service_exists(self) -> bool: ...
     def _stop_server(self) -> None: ...
     def _run_cli(
         self,
@@ -118,6 +114,10 @@ class WordpressCharm(ops.charm.CharmBase):
     def _plugin_reconciliation(self) -> None: ...
     def _core_reconciliation(self) -> None: ...
     def _storage_mounted(self) -> bool: ...
+    def _reconciliation_inputs(
+        self,
+    ) -> Tuple[bool, Dict[str, Any], Optional[DatabaseConfig], Dict[str, str]]: ...
+    def _reconcile_if_inputs_changed(self) -> None: ...
     def _reconciliation(self, _event: ops.charm.EventBase) -> None: ...
     def _on_apache_prometheus_exporter_pebble_ready(
         self, event: ops.charm.PebbleReadyEvent
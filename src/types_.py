@@ -3,10 +3,12 @@
 
 """Module for commonly used internal types in WordPress charm."""
 
-from typing import Any, NamedTuple, Optional, Union
+import dataclasses
+from typing import Any, Optional, Union
 
 
-class CommandExecResult(NamedTuple):
+@dataclasses.dataclass(frozen=True, slots=True)
+class CommandExecResult:
     """Result of executed command from WordPress container.
 
     Attrs:
@@ -20,7 +22,8 @@ class CommandExecResult(NamedTuple):
     stderr: Union[str, bytes, None]
 
 
-class ExecResult(NamedTuple):
+@dataclasses.dataclass(frozen=True, slots=True)
+class ExecResult:
     """Wrapper for executed command result from WordPress container.
 
     Attrs:
@@ -34,7 +37,8 @@ class ExecResult(NamedTuple):
     message: str
 
 
-class DatabaseConfig(NamedTuple):
+@dataclasses.dataclass(frozen=True, slots=True)
+class DatabaseConfig:
     """Configuration values required to connect to database.
 
     Attrs:
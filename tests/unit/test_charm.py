@@ -38,7 +38,7 @@ def test_generate_wp_secret_keys(harness: ops.testing.Harness):
     del secrets["default_admin_password"]
     key_values = list(secrets.values())
     assert set(secrets.keys()) == set(
-        charm._wordpress_secret_key_fields()
+        charm._WORDPRESS_SECRET_KEY_FIELDS
     ), "generated WordPress secrets should contain all required fields"
     assert len(key_values) == len(set(key_values)), "no two secret values should be the same"
     for value in key_values:
@@ -183,6 +183,23 @@ def test_database_invalid_port_relation(
         charm._current_effective_db_info  # pylint: disable=pointless-statement
 
 
+def test_current_wp_config_pull_error(harness: ops.testing.Harness, patch: WordpressPatch):
+    """
+    arrange: the wp-config.php file in the container can not be read.
+    act: retrieve the current wp-config.php.
+    assert: the pebble error should be raised instead of treating wp-config.php as missing.
+    """
+    harness.begin()
+    charm: WordpressCharm = typing.cast(WordpressCharm, harness.charm)
+    with unittest.mock.patch.object(
+        patch.container,
+        "pull",
+        side_effect=ops.pebble.PathError("permission-denied", "permission denied"),
+    ):
+        with pytest.raises(ops.pebble.PathError):
+            charm._current_wp_config()
+
+
 def test_wp_config_before_consensus(harness: ops.testing.Harness):
     """
     arrange: before WordPress application unit consensus has been reached.
@@ -226,7 +243,7 @@ def test_wp_config(
     charm: WordpressCharm = typing.cast(WordpressCharm, harness.charm)
     wp_config = charm._gen_wp_config()
 
-    for secret_key in charm._wordpress_secret_key_fields():
+    for secret_key in charm._WORDPRESS_SECRET_KEY_FIELDS:
         secret_value = replica_consensus[secret_key]
         assert in_same_line(
             wp_config, "define(", secret_key.upper(), secret_value
@@ -453,6 +470,125 @@ def test_core_reconciliation(
     ), "WordPress should be installed after database config changed"
 
 
+@pytest.mark.usefixtures("attach_storage")
+def test_reconciliation_skipped_when_inputs_unchanged(
+    patch: WordpressPatch,
+    harness: ops.testing.Harness,
+    setup_replica_consensus: typing.Callable[[], dict],
+):
+    """
+    arrange: after peer relation established and database configured.
+    act: run the reconciliation again with and without config changes.
+    assert: the reconciliation only runs again when its inputs have changed.
+    """
+    harness.set_can_connect(harness.model.unit.containers["wordpress"], True)
+    setup_replica_consensus()
+    db_config = {
+        "db_host": "config_db_host",
+        "db_name": "config_db_name",
+        "db_user": "config_db_user",
+        "db_password": "config_db_password",
+    }
+    patch.database.prepare_database(
+        host=db_config["db_host"],
+        database=db_config["db_name"],
+        user=db_config["db_user"],
+        password=db_config["db_password"],
+    )
+    harness.update_config(db_config)
+    charm: WordpressCharm = typing.cast(WordpressCharm, harness.charm)
+
+    with unittest.mock.patch.object(charm, "_core_reconciliation") as core_reconciliation_mock:
+        charm._reconciliation(unittest.mock.MagicMock())
+        core_reconciliation_mock.assert_not_called()
+        harness.update_config({"themes": "twentynineteen"})
+        core_reconciliation_mock.assert_called_once()
+
+    assert isinstance(harness.model.unit.status, ops.charm.model.ActiveStatus)
+
+
+@pytest.mark.usefixtures("attach_storage")
+def test_reconciliation_rerun_after_secrets_rotated(
+    patch: WordpressPatch,
+    harness: ops.testing.Harness,
+    action_event_mock: unittest.mock.MagicMock,
+    setup_replica_consensus: typing.Callable[[], dict],
+):
+    """
+    arrange: after peer relation established and database configured.
+    act: run the rotate-wordpress-secrets action.
+    assert: the reconciliation runs again since the replica relation data has changed.
+    """
+    harness.set_can_connect(harness.model.unit.containers["wordpress"], True)
+    setup_replica_consensus()
+    db_config = {
+        "db_host": "config_db_host",
+        "db_name": "config_db_name",
+        "db_user": "config_db_user",
+        "db_password": "config_db_password",
+    }
+    patch.database.prepare_database(
+        host=db_config["db_host"],
+        database=db_config["db_name"],
+        user=db_config["db_user"],
+        password=db_config["db_password"],
+    )
+    harness.update_config(db_config)
+    charm: WordpressCharm = typing.cast(WordpressCharm, harness.charm)
+
+    with unittest.mock.patch.object(charm, "_core_reconciliation") as core_reconciliation_mock:
+        charm._on_rotate_wordpress_secrets_action(action_event_mock)
+        core_reconciliation_mock.assert_called_once()
+
+
+@pytest.mark.usefixtures("attach_storage")
+def test_reconciliation_rerun_after_leadership_changed(
+    patch: WordpressPatch,
+    harness: ops.testing.Harness,
+    setup_replica_consensus: typing.Callable[[], dict],
+):
+    """
+    arrange: after peer relation established and database configured.
+    act: lose the leadership and run the reconciliation again.
+    assert: the reconciliation runs again since the leadership has changed.
+    """
+    harness.set_can_connect(harness.model.unit.containers["wordpress"], True)
+    setup_replica_consensus()
+    db_config = {
+        "db_host": "config_db_host",
+        "db_name": "config_db_name",
+        "db_user": "config_db_user",
+        "db_password": "config_db_password",
+    }
+    patch.database.prepare_database(
+        host=db_config["db_host"],
+        database=db_config["db_name"],
+        user=db_config["db_user"],
+        password=db_config["db_password"],
+    )
+    harness.update_config(db_config)
+    charm: WordpressCharm = typing.cast(WordpressCharm, harness.charm)
+
+    with unittest.mock.patch.object(charm, "_core_reconciliation") as core_reconciliation_mock:
+        harness.set_leader(False)
+        charm._reconciliation(unittest.mock.MagicMock())
+        core_reconciliation_mock.assert_called_once()
+
+
+def test_reconciliation_inputs_before_peer_relation_ready(harness: ops.testing.Harness):
+    """
+    arrange: charm peer relation is not ready.
+    act: snapshot the reconciliation inputs.
+    assert: the replica relation data in the snapshot should be empty.
+    """
+    harness.begin()
+    charm: WordpressCharm = typing.cast(WordpressCharm, harness.charm)
+
+    _, _, _, replica_data = charm._reconciliation_inputs()
+
+    assert replica_data == {}
+
+
 def test_get_initial_password_action_before_replica_consensus(
     harness: ops.testing.Harness, action_event_mock: unittest.mock.MagicMock
 ):
@@ -613,13 +749,13 @@ def test_theme_reconciliation(
     harness.update_config({"themes": "123, abc"})
 
     assert patch.container.installed_themes == set(
-        charm._WORDPRESS_DEFAULT_THEMES + ["abc", "123"]
+        charm._WORDPRESS_DEFAULT_THEMES | {"abc", "123"}
     ), "adding themes to themes config should trigger theme installation"
 
     harness.update_config({"themes": "123"})
 
     assert patch.container.installed_themes == set(
-        charm._WORDPRESS_DEFAULT_THEMES + ["123"]
+        charm._WORDPRESS_DEFAULT_THEMES | {"123"}
     ), "removing themes from themes config should trigger theme deletion"
 
 
@@ -658,13 +794,13 @@ def test_plugin_reconciliation(
     harness.update_config({"plugins": "123, abc"})
 
     assert patch.container.installed_plugins == set(
-        charm._WORDPRESS_DEFAULT_PLUGINS + ["abc", "123"]
+        charm._WORDPRESS_DEFAULT_PLUGINS | {"abc", "123"}
     ), "adding plugins to plugins config should trigger plugin installation"
 
     harness.update_config({"plugins": "123"})
 
     assert patch.container.installed_plugins == set(
-        charm._WORDPRESS_DEFAULT_PLUGINS + ["123"]
+        charm._WORDPRESS_DEFAULT_PLUGINS | {"123"}
     ), "removing plugins from plugins config should trigger plugin deletion"
 
 
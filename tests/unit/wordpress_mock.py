@@ -379,17 +379,19 @@ class WordpressContainerMock:
         return handler(self, cmd)
 
     def pull(self, path: str) -> typing.IO[str]:
-        """Mock method for :meth:`ops.charm.model.Container.pull`."""
+        """Mock method for :meth:`ops.charm.model.Container.pull`.
+
+        Raises:
+            PathError: if path is not found in the mock filesystem.
+        """
+        if path not in self.fs:
+            raise ops.pebble.PathError("not-found", f"stat {path}: no such file or directory")
         return io.StringIO(self.fs[path])
 
     def push(self, path: str, source: str, user=None, group=None, permissions=None) -> None:
         """Mock method for :meth:`ops.charm.model.Container.push`."""
         self.fs[path] = source
 
-    def exists(self, path):
-        """Mock method for :meth:`ops.charm.model.Container.exists`."""
-        return path in self.fs
-
     def list_files(self, path: str) -> typing.List[str]:
         """Mock method for :meth:`ops.charm.model.Container.list_files`."""
         if not path.endswith("/"):